@@ -13,163 +13,399 @@ Prereqs (created by notebooks 01–05 / SQL scripts):
 
 from __future__ import annotations
 
+import json
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 from typing import List
 
+from snowflake.ml.registry import Registry
 from snowflake.snowpark.context import get_active_session
-from snowflake.snowpark.functions import col
+from snowflake.snowpark.functions import col, lit
+from snowflake.snowpark.types import TimestampType
+
+# Signal label in GET_TRADING_SIGNAL output, e.g. "📈 **SIGNAL: 🟢 BUY**" -> "🟢 BUY".
+# Kept as a pattern string with a named group: Arrow-backed str.extract compiles it natively.
+_SIGNAL_PATTERN = r"SIGNAL:\s*(?P<signal>[^*\n]+)"
+
+# Window-keyed caches hash timestamps by their epoch value rather than pickling them
+_TS_HASH_FUNCS = {pd.Timestamp: lambda ts: ts.value}
+
+
+@st.cache_resource(show_spinner=False)
+def _enable_cte_optimization(_session) -> None:
+    # Let Snowpark fold repeated sub-plans (e.g. the PRICE_FEATURES window under PREDICT) into CTEs.
+    # Cached so the setter runs once at bootstrap rather than on every rerun; no spinner, since
+    # main() reaches this before st.set_page_config.
+    _session.cte_optimization_enabled = True
 
 
 def get_session():
     session = get_active_session()
+    _enable_cte_optimization(session)
     return session
 
 
-def list_model_versions(session) -> List[str]:
+def _to_frame(sp) -> pd.DataFrame:
+    # Fetch through Arrow and keep Arrow-backed columns instead of going through to_pandas()
+    return sp.to_arrow().to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True)
+
+
+@st.cache_resource
+def get_registry():
+    return Registry(session=get_active_session(), database_name="SP500_STOCK_DEMO", schema_name="DATA")
+
+
+def _parse_versions(val) -> List[str]:
+    if isinstance(val, (list, tuple)):
+        return list(val)
+    # SHOW MODELS and Snowpark ARRAY values arrive as JSON text, e.g. '["V_1","V_2"]'
+    if isinstance(val, str):
+        return json.loads(val) or []
+    return []
+
+
+def _latest_version(versions: List[str]) -> str | None:
+    # sort by numeric suffix
+    def key(v):
+        try:
+            return int(str(v).split("_")[-1])
+        except Exception:
+            return -1
+    return sorted(versions, key=key)[-1] if versions else None
+
+
+# Leading-underscore `_session` args are skipped by Streamlit when hashing cache keys
+@st.cache_data(ttl=300, show_spinner=False)
+def get_model_meta(_session) -> tuple[List[str], str | None]:
+    """Return (versions, default version) of XGB_SP500_RET3M from a single SHOW MODELS"""
     # Prefer Registry API to avoid permissions/views issues
     try:
-        from snowflake.ml.registry import Registry
-
-        reg = Registry(session=session, database_name="SP500_STOCK_DEMO", schema_name="DATA")
-        models_df = reg.show_models()
+        models_df = get_registry().show_models()
         if not models_df.empty:
             df = models_df.rename(columns=lambda c: str(c).lower())
-            import ast as _ast
-
             row = df.loc[df["name"] == "XGB_SP500_RET3M"]
             if not row.empty:
-                val = row.iloc[0]["versions"]
-                if isinstance(val, str):
-                    return _ast.literal_eval(val) or []
-                if isinstance(val, list):
-                    return val
+                versions = _parse_versions(row.iloc[0]["versions"])
+                default = row.iloc[0].get("default_version_name")
+                return versions, default if isinstance(default, str) else _latest_version(versions)
     except Exception:
         pass
-    # Fallback: read versions column and parse
+    # Fallback: flatten the versions array server-side (one row per version); default to the highest version
     try:
-        row = (
-            session.sql(
-                "SELECT versions FROM SP500_STOCK_DEMO.DATA.SNOWFLAKE_ML_MODELS WHERE name = 'XGB_SP500_RET3M'"
+        rows = (
+            _session.sql(
+                "SELECT v.value::string AS VERSION FROM SP500_STOCK_DEMO.DATA.SNOWFLAKE_ML_MODELS m, "
+                "LATERAL FLATTEN(INPUT => TRY_PARSE_JSON(TO_VARCHAR(m.versions))) v "
+                "WHERE m.name = 'XGB_SP500_RET3M'"
             ).collect()
         )
-        if row:
-            val = row[0]["VERSIONS"]
-            import ast as _ast
-
-            if isinstance(val, str):
-                return _ast.literal_eval(val) or []
-            if isinstance(val, list):
-                return val
+        if rows:
+            versions = [r["VERSION"] for r in rows]
+            return versions, _latest_version(versions)
     except Exception:
         pass
-    return []
+    return [], None
 
 
-def get_default_version(session) -> str | None:
-    try:
-        from snowflake.ml.registry import Registry
-
-        reg = Registry(session=session, database_name="SP500_STOCK_DEMO", schema_name="DATA")
-        mv = reg.get_model("XGB_SP500_RET3M").default
-        # mv may be a ModelVersion object with name attribute
-        name = getattr(mv, "name", None)
-        if isinstance(name, str):
-            return name
-    except Exception:
-        pass
-    # Fallback: highest version from list
-    try:
-        vers = list_model_versions(session)
-        if vers:
-            # sort by numeric suffix
-            def key(v):
-                try:
-                    return int(str(v).split("_")[-1])
-                except Exception:
-                    return -1
-            return sorted(vers, key=key)[-1]
-    except Exception:
-        pass
-    return None
+# Ticker lists come back sorted and capped server-side
+MAX_TICKERS = 500
 
 
-def list_tickers(session) -> List[str]:
+@st.cache_data(ttl=600, show_spinner=False)
+def list_tickers(_session) -> List[str]:
     try:
-        tickers = (
-            session.table("SP500_STOCK_DEMO.DATA.SP500_TICKERS").select("TICKER").to_pandas()["TICKER"].tolist()
-        )
+        tickers = _to_frame(
+            _session.table("SP500_STOCK_DEMO.DATA.SP500_TICKERS").select("TICKER").sort(col("TICKER")).limit(MAX_TICKERS)
+        )["TICKER"].tolist()
         if tickers:
             return tickers
     except Exception:
         pass
-    # Fallback: distinct from PRICE_FEATURES
-    return (
-        session.table("SP500_STOCK_DEMO.DATA.PRICE_FEATURES")
-        .select("TICKER")
+    # Fallback: the SP_500_LIST constituents table SETUP.sql creates (~500 rows), read directly so
+    # refilling this cache never touches the PRICE_FEATURES fact table
+    return _to_frame(
+        _session.table("SP500_STOCK_DEMO.DATA.SP_500_LIST")
+        .filter(col("SYMBOL").is_not_null())
+        .select(col("SYMBOL").alias("TICKER"))
         .distinct()
-        .to_pandas()["TICKER"].tolist()
-    )
+        .sort(col("TICKER"))
+        .limit(MAX_TICKERS)
+    )["TICKER"].tolist()
 
 
-def get_time_bounds(session):
-    bounds = session.sql("SELECT MIN(TS) AS MN, MAX(TS) AS MX FROM SP500_STOCK_DEMO.DATA.PRICE_FEATURES").collect()[0]
+def _time_bounds(bounds):
     mn = pd.to_datetime(bounds["MN"]) if bounds["MN"] is not None else pd.Timestamp.today() - pd.Timedelta(days=90)
     mx = pd.to_datetime(bounds["MX"]) if bounds["MX"] is not None else pd.Timestamp.today()
     return mn, mx
 
 
-def load_existing_predictions(session, symbol: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
-    start_dt = pd.Timestamp(start_ts).to_pydatetime()
-    end_dt = pd.Timestamp(end_ts).to_pydatetime()
-    sp = (
-        session.table("SP500_STOCK_DEMO.DATA.PREDICTIONS_SP500_RET3M")
-        .filter((col("TICKER") == symbol) & (col("TS") >= start_dt) & (col("TS") <= end_dt))
-        .sort(col("TS"))
-    )
-    return sp.to_pandas()
+@st.cache_data(ttl=600, show_spinner=False)
+def get_time_bounds(_session):
+    bounds = _session.sql("SELECT MIN(TS) AS MN, MAX(TS) AS MX FROM SP500_STOCK_DEMO.DATA.PRICE_FEATURES").collect()[0]
+    return _time_bounds(bounds)
+
 
+@st.cache_data(ttl=600, show_spinner=False)
+def get_sidebar_meta(_session):
+    """Tickers and PRICE_FEATURES time bounds in one round-trip; falls back to the separate lookups"""
+    try:
+        # Tickers come from SP_500_LIST, which SETUP.sql always creates (SP500_TICKERS is optional), so the
+        # statement holds on every deployment; PRICE_FEATURES only serves MIN/MAX(TS), not a DISTINCT scan
+        row = _session.sql(
+            "SELECT MIN(TS) AS MN, MAX(TS) AS MX, "
+            "(SELECT ARRAY_AGG(SYMBOL) WITHIN GROUP (ORDER BY SYMBOL) FROM "
+            "(SELECT DISTINCT SYMBOL FROM SP500_STOCK_DEMO.DATA.SP_500_LIST WHERE SYMBOL IS NOT NULL "
+            f"ORDER BY SYMBOL LIMIT {MAX_TICKERS})) AS TICKERS "
+            "FROM SP500_STOCK_DEMO.DATA.PRICE_FEATURES"
+        ).collect()[0]
+    except Exception:
+        return list_tickers(_session), *get_time_bounds(_session)
+    # ARRAY values arrive as JSON text
+    tickers = json.loads(row["TICKERS"]) if row["TICKERS"] else []
+    return tickers or list_tickers(_session), *_time_bounds(row)
 
-def score_on_demand(session, symbol: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp, version: str) -> pd.DataFrame:
-    from snowflake.ml.registry import Registry
 
-    reg = Registry(session=session, database_name="SP500_STOCK_DEMO", schema_name="DATA")
-    mv = reg.get_model("XGB_SP500_RET3M").version(version)
-    start_dt = pd.Timestamp(start_ts).to_pydatetime()
-    end_dt = pd.Timestamp(end_ts).to_pydatetime()
-    feats = (
-        session.table("SP500_STOCK_DEMO.DATA.PRICE_FEATURES")
-        .filter((col("TICKER") == symbol) & (col("TS") >= start_dt) & (col("TS") <= end_dt))
-        .sort(col("TS"))
-    )
-    preds_sp = mv.run(feats, function_name="PREDICT")
-    return preds_sp.to_pandas()
-
-
-def load_close_series(session, symbol: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
-    start_dt = pd.Timestamp(start_ts).to_pydatetime()
-    end_dt = pd.Timestamp(end_ts).to_pydatetime()
-    return (
-        session.table("SP500_STOCK_DEMO.DATA.PRICE_FEATURES")
-        .filter((col("TICKER") == symbol) & (col("TS") >= start_dt) & (col("TS") <= end_dt))
-        .select("TICKER", "TS", "CLOSE")
-        .sort(col("TS"))
-        .to_pandas()
+@st.cache_resource
+def get_model_version(version: str):
+    return get_registry().get_model("XGB_SP500_RET3M").version(version)
+
+
+def _window_filter(symbol: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp):
+    # Windows are half-open [start_ts, end_ts) on day boundaries so range pruning on TS stays clean.
+    # Explicit TIMESTAMP literals keep the generated SQL identical for identical windows.
+    start_lit = lit(pd.Timestamp(start_ts).to_pydatetime()).cast(TimestampType())
+    end_lit = lit(pd.Timestamp(end_ts).to_pydatetime()).cast(TimestampType())
+    return (col("TICKER") == symbol) & (col("TS") >= start_lit) & (col("TS") < end_lit)
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    # float32 and a categorical TICKER are plenty for charting and summary metrics
+    return df.astype({"TICKER": "category", "CLOSE": "float32[pyarrow]", "PREDICTED_RETURN": "float32[pyarrow]"})
+
+
+@st.cache_data(ttl=900, max_entries=32, show_spinner=False)
+def load_ticker_history(_session, symbol: str) -> pd.DataFrame:
+    # One wide pull per ticker; date-range changes are served by slicing this frame in memory.
+    # Predictions are joined onto the CLOSE series in Snowflake so a single frame is fetched.
+    ticker = col("TICKER") == symbol
+    feats = _session.table("SP500_STOCK_DEMO.DATA.PRICE_FEATURES").filter(ticker).select("TICKER", "TS", "CLOSE")
+    preds = (
+        _session.table("SP500_STOCK_DEMO.DATA.PREDICTIONS_SP500_RET3M")
+        .filter(ticker)
+        .select("TICKER", "TS", "PREDICTED_RETURN")
     )
+    df = _to_frame(feats.join(preds, on=["TICKER", "TS"], how="left").select("TICKER", "TS", "CLOSE", "PREDICTED_RETURN"))
+    # Single-ticker frames are small; ordering client-side avoids a warehouse ORDER BY
+    return _downcast(df).sort_values("TS", ignore_index=True)
+
+
+def slice_window(df: pd.DataFrame, start_ts: pd.Timestamp, end_ts: pd.Timestamp) -> pd.DataFrame:
+    # History is sorted by TS, so the window is a contiguous run found by binary search
+    lo = df["TS"].searchsorted(start_ts, side="left")
+    hi = df["TS"].searchsorted(end_ts, side="left")
+    return df.iloc[lo:hi].reset_index(drop=True)
+
+
+def frame_overview_stats(df: pd.DataFrame) -> tuple[int, float, float]:
+    pred_col = df["PREDICTED_RETURN"].dropna()
+    avg_pred = float(pred_col.mean()) if not pred_col.empty else 0.0
+    # Arrow-backed std() of a single value is <NA>, which float() rejects
+    std_pred = float(pred_col.std()) if len(pred_col) > 1 else 0.0
+    return len(df), avg_pred, std_pred
+
+
+def _downsample(df: pd.DataFrame, n: int = 2000) -> pd.DataFrame:
+    # Stride-thin long series so the browser receives at most n points per chart (ceiling stride)
+    return df if len(df) <= n else df.iloc[:: -(-len(df) // n)]
+
+
+def render_overview_metrics(metric_cols, num_rows: int, avg_pred: float, std_pred: float):
+    metric_cols[0].metric("Rows", f"{num_rows:,}")
+    metric_cols[1].metric("Avg predicted", f"{avg_pred:.5f}")
+    metric_cols[2].metric("Std predicted", f"{std_pred:.5f}")
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False, hash_funcs=_TS_HASH_FUNCS)
+def score_on_demand(
+    _session, symbol: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp, version: str
+) -> tuple[pd.DataFrame, tuple[int, float, float]]:
+    mv = get_model_version(version)
+    feats = _session.table("SP500_STOCK_DEMO.DATA.PRICE_FEATURES").filter(_window_filter(symbol, start_ts, end_ts))
+    # PREDICT passes input columns through, so CLOSE comes back alongside the prediction
+    preds_sp = mv.run(feats, function_name="PREDICT").select("TICKER", "TS", "CLOSE", "PREDICTED_RETURN")
+
+    # Fold each Arrow batch into running prediction stats as it arrives (pairwise Welford merge),
+    # so the overview cards come out of the fetch itself rather than another pass over the frame
+    batches, num_rows, n, mean, m2 = [], 0, 0, 0.0, 0.0
+    for batch in preds_sp.to_arrow_batches():
+        batches.append(batch)
+        num_rows += batch.num_rows
+        pred = batch.column("PREDICTED_RETURN").drop_null()
+        k = len(pred)
+        if k:
+            batch_mean = float(pc.mean(pred).as_py())
+            delta = batch_mean - mean
+            m2 += float(pc.variance(pred, ddof=0).as_py()) * k + delta * delta * n * k / (n + k)
+            n += k
+            mean += delta * k / n
+    stats = (num_rows, mean, (m2 / (n - 1)) ** 0.5 if n > 1 else 0.0)
+
+    if not batches:
+        return pd.DataFrame(columns=["TICKER", "TS", "CLOSE", "PREDICTED_RETURN"]), stats
+    df = pa.Table.from_batches(batches).to_pandas(types_mapper=pd.ArrowDtype)
+    return _downcast(df).sort_values("TS", ignore_index=True), stats
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_trading_signal(_session, ticker: str, days: int) -> str | None:
+    # Bound parameters let Snowflake reuse the compiled statement across tickers
+    result = _session.sql("SELECT GET_TRADING_SIGNAL(?, ?) as signal", params=[ticker, days]).collect()
+    return result[0]['SIGNAL'] if result else None
 
 
 def get_trading_signal_demo(session, ticker: str, days: int = 7) -> str:
     """Call the GET_TRADING_SIGNAL function directly for demo purposes"""
     try:
-        result = session.sql(f"SELECT GET_TRADING_SIGNAL('{ticker}', {days}) as signal").collect()
-        if result:
-            return result[0]['SIGNAL']
-        return "No signal available"
+        if ticker not in get_sidebar_meta(session)[0]:
+            return f"Unknown ticker: {ticker}"
+        signal = _fetch_trading_signal(session, ticker, days)
+        return signal if signal is not None else "No signal available"
     except Exception as e:
         return f"Error getting signal: {str(e)}"
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def compare_trading_signals(_session, tickers: tuple, days: int = 7) -> pd.DataFrame:
+    """Score several tickers with GET_TRADING_SIGNAL in one round-trip"""
+    values = ", ".join(["(?)"] * len(tickers))
+    df = _to_frame(
+        _session.sql(
+            f"SELECT v.TICKER, GET_TRADING_SIGNAL(v.TICKER, ?) AS SIGNAL FROM (VALUES {values}) AS v(TICKER)",
+            params=[days, *tickers],
+        )
+    )
+    signal = df["SIGNAL"].str.extract(_SIGNAL_PATTERN)["signal"].str.strip()
+    return pd.DataFrame({"Ticker": df["TICKER"], "Signal": signal.fillna("Unknown")})
+
+
+@st.fragment
+def render_signals_tab(session, tickers: List[str]):
+    st.subheader("🤖 AI Trading Signals")
+    st.markdown("**Experience the same ML trading signals that power Snowflake Intelligence!**")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        # Signal analysis section
+        signal_ticker = st.selectbox("Select ticker for signal analysis", options=tickers[:20] if tickers else [], key="signal_ticker")
+        signal_days = st.slider("Analysis period (days)", min_value=1, max_value=90, value=7, key="signal_days")
+
+        if st.button("Get AI Trading Signal", type="primary"):
+            if signal_ticker:
+                with st.spinner("🤖 Analyzing with AI..."):
+                    signal_result = get_trading_signal_demo(session, signal_ticker, signal_days)
+
+                st.markdown("### 📊 AI Analysis Result:")
+                st.text_area("Trading Signal", value=signal_result, height=400, key="signal_output")
+            else:
+                st.warning("Please select a ticker")
+
+    with col2:
+        st.markdown("### 🎯 Demo Questions")
+        st.markdown("Try these in **Snowflake Intelligence**:")
+
+        demo_questions = [
+            f"What is the trading signal for {signal_ticker or 'AAPL'} based on the last 7 days?",
+            f"Give me a trading recommendation for {signal_ticker or 'MSFT'} using 14 days of data",
+            f"Based on our ML model, should I buy or sell {signal_ticker or 'GOOGL'}?",
+            "Compare trading signals for AAPL, MSFT, and GOOGL using the last 30 days"
+        ]
+
+        for i, question in enumerate(demo_questions, 1):
+            st.markdown(f"**{i}.** *{question}*")
+
+        st.markdown("---")
+        st.markdown("### 🔗 Intelligence Integration")
+        st.markdown("""
+        **Function:** `GET_TRADING_SIGNAL`  
+        **Parameters:**
+        - `ticker_symbol` (string)
+        - `days_back` (integer, default: 7)
+
+        **Try it in Intelligence!** 🚀
+        """)
+
+    # Quick comparison section
+    st.markdown("---")
+    st.subheader("📈 Quick Signal Comparison")
+
+    if st.button("Compare Top 5 Stocks", help="Get trading signals for AAPL, MSFT, GOOGL, AMZN, TSLA"):
+        comparison_tickers = ('AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA')
+        try:
+            with st.spinner("Analyzing top 5 stocks..."):
+                comparison_df = compare_trading_signals(session, comparison_tickers, 7)
+        except Exception as e:
+            comparison_df = pd.DataFrame()
+            st.error(f"Could not compare signals: {e}")
+
+        if not comparison_df.empty:
+            st.dataframe(comparison_df, use_container_width=True)
+        else:
+            st.warning("No comparison results available")
+
+
+# PSI and SHAP tables are rewritten at most daily by the monitoring/training notebooks
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_psi(_session) -> pd.DataFrame:
+    return _to_frame(_session.table("SP500_STOCK_DEMO.DATA.DRIFT_PSI_SP500").sort(col("FEATURE")))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_shap_top(_session, n: int = 15) -> pd.DataFrame:
+    # Columns were written from a lower-case pandas frame, so they are quoted identifiers
+    return _to_frame(
+        _session.table("SP500_STOCK_DEMO.DATA.FEATURE_SHAP_GLOBAL_TOP")
+        .select('"feature"', '"mean_abs_shap"')
+        .sort(col('"mean_abs_shap"').desc())
+        .limit(n)
+    )
+
+
+@st.fragment
+def render_drift_tab(session):
+    st.subheader("Recent feature drift (PSI)")
+    try:
+        psi_pd = load_psi(session)
+        if not psi_pd.empty:
+            st.dataframe(psi_pd, hide_index=True, use_container_width=True)
+        else:
+            st.info("PSI table is empty.")
+    except Exception:
+        st.info("PSI table not found. Run the inference/monitoring notebook to generate it.")
+
+
+@st.fragment
+def render_explain_tab(session):
+    st.subheader("Global feature importance (mean |SHAP|)")
+    try:
+        topn = load_shap_top(session, 15)
+        if not topn.empty:
+            st.bar_chart(topn.set_index("feature")["mean_abs_shap"])
+            st.dataframe(topn, hide_index=True)
+        else:
+            st.info("No SHAP importance table found.")
+    except Exception:
+        st.info("No SHAP importance table found.")
+
+
+# Rows sent to the detail table before the user opts into the full window
+MAX_TABLE_ROWS = 500
+
+
 def main():
     session = get_session()
 
@@ -182,8 +418,17 @@ def main():
 
     with st.sidebar:
         st.header("Controls")
-        versions = list_model_versions(session)
-        default_ver = get_default_version(session)
+        if st.button("Invalidate model cache", help="Re-resolve the registry, model versions and default version"):
+            st.cache_resource.clear()
+            get_model_meta.clear()
+            st.session_state.pop("last_view", None)
+        if st.button("Refresh data", help="Reload tickers, date bounds and cached price/prediction history"):
+            get_sidebar_meta.clear()
+            list_tickers.clear()
+            get_time_bounds.clear()
+            load_ticker_history.clear()
+            st.session_state.pop("last_view", None)
+        versions, default_ver = get_model_meta(session)
         # Put default first if present
         if default_ver and default_ver in versions:
             versions = [default_ver] + [v for v in versions if v != default_ver]
@@ -196,10 +441,9 @@ def main():
             help="Use persisted predictions or run the selected model on-the-fly for the time range",
         )
 
-        tickers = sorted(list_tickers(session))
-        ticker = st.selectbox("Ticker", options=tickers[:500] if tickers else [])
+        tickers, mn, mx = get_sidebar_meta(session)
+        ticker = st.selectbox("Ticker", options=tickers)
 
-        mn, mx = get_time_bounds(session)
         start_date = st.date_input(
             "Start date", value=(mx - pd.Timedelta(days=30)).date(), min_value=mn.date(), max_value=mx.date()
         )
@@ -207,267 +451,128 @@ def main():
 
         run_button = st.button("Update view")
 
-    tab_overview, tab_preds, tab_signals, tab_drift, tab_explain = st.tabs([
-        "Overview",
-        "Predictions", 
-        "AI Trading Signals",
-        "Drift",
-        "Explainability",
-    ])
-
-    if run_button or True:
-        start_ts = pd.to_datetime(start_date)
-        end_ts = pd.to_datetime(end_date) + pd.Timedelta(hours=23, minutes=59)
-
-        # Show debug info in sidebar
-        with st.sidebar:
-            st.markdown("---")
-            st.markdown("**Debug Info:**")
-            st.text(f"Ticker: {ticker}")
-            st.text(f"Date range: {start_date} to {end_date}")
-            st.text(f"Source: {source_mode}")
+    # A stateful view selector rather than st.tabs: st.tabs executes every tab body on each rerun,
+    # whereas only the selected view issues queries here
+    view = st.radio(
+        "View",
+        options=["Overview", "Predictions", "AI Trading Signals", "Drift", "Explainability"],
+        horizontal=True,
+        key="tab",
+        label_visibility="collapsed",
+    )
 
+    # Sidebar edits stay pending until "Update view" is pressed; only the active selection is loaded
+    st.session_state.pending = (ticker, start_date, end_date, selected_version, source_mode)
+    if run_button or "active" not in st.session_state:
+        st.session_state.active = st.session_state.pending
+    elif st.session_state.pending != st.session_state.active:
+        st.sidebar.caption("Selection changed — press **Update view** to apply.")
+    ticker, start_date, end_date, selected_version, source_mode = st.session_state.active
+
+    # These views don't use the prediction window. Fragments rerun on their own when their
+    # widgets change, without re-running main()
+    if view == "AI Trading Signals":
+        render_signals_tab(session, tickers)
+        return
+    if view == "Drift":
+        render_drift_tab(session)
+        return
+    if view == "Explainability":
+        render_explain_tab(session)
+        return
+
+    # Day-aligned, end-exclusive bounds cover the whole end date and keep loader cache keys stable
+    start_ts = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+    # Show debug info in sidebar
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("**Debug Info:**")
+        st.text(f"Ticker: {ticker}")
+        st.text(f"Date range: {start_date} to {end_date}")
+        st.text(f"Source: {source_mode}")
+
+    if view == "Overview":
+        metric_cols = st.columns(4)
+        metric_cols[3].metric("Model version", selected_version)
+
+    # Reruns that don't change the active selection (switching views, other widgets) reuse the
+    # last loaded window instead of going back to Snowflake
+    view_key = (ticker, start_ts, end_ts, selected_version, source_mode)
+    last_view = st.session_state.get("last_view")
+    if last_view is not None and last_view["key"] == view_key:
+        merged, stats = last_view["merged"], last_view["stats"]
+        if view == "Overview" and stats is not None:
+            render_overview_metrics(metric_cols, *stats)
+    else:
+        # Persisted-prediction metrics come from the sliced frame below, not a separate Snowflake
+        # aggregate, so the cards match the chart and moving the window stays query-free
+        stats, loaded = None, True
         try:
             if source_mode == "Existing predictions":
-                preds_pd = load_existing_predictions(session, ticker, start_ts, end_ts)
+                merged = slice_window(load_ticker_history(session, ticker), start_ts, end_ts)
             else:
-                preds_pd = score_on_demand(session, ticker, start_ts, end_ts, selected_version)
+                merged, stats = score_on_demand(session, ticker, start_ts, end_ts, selected_version)
+                if view == "Overview":
+                    render_overview_metrics(metric_cols, *stats)
         except Exception as e:
-            preds_pd = pd.DataFrame()
+            merged = pd.DataFrame(columns=["TICKER", "TS", "CLOSE", "PREDICTED_RETURN"])
             st.error(f"Could not load predictions: {e}")
+            loaded = False
+        if loaded:
+            st.session_state.last_view = {"key": view_key, "merged": merged, "stats": stats}
 
-        try:
-            feats_pd = load_close_series(session, ticker, start_ts, end_ts)
-        except Exception as e:
-            feats_pd = pd.DataFrame(columns=["TICKER", "TS", "CLOSE"])
-            st.error(f"Could not load CLOSE series: {e}")
-        
-        # Debug data info
-        with st.sidebar:
-            st.text(f"Predictions: {len(preds_pd)} rows")
-            st.text(f"Features: {len(feats_pd)} rows")
-
-        # Build display frame: base on features to respect the selected window; left-join predictions
-        if not feats_pd.empty:
-            merged = feats_pd.copy()
-            if not preds_pd.empty and "PREDICTED_RETURN" in preds_pd.columns:
-                # Ensure TS columns are datetime for proper merging
-                merged['TS'] = pd.to_datetime(merged['TS'])
-                preds_pd['TS'] = pd.to_datetime(preds_pd['TS'])
-                merged = merged.merge(
-                    preds_pd[["TICKER", "TS", "PREDICTED_RETURN"]],
-                    on=["TICKER", "TS"], how="left"
-                )
-        else:
-            merged = preds_pd.copy() if not preds_pd.empty else pd.DataFrame()
-        
-        # Ensure merged is not None and has proper data types
-        if merged is None or merged.empty:
-            merged = pd.DataFrame(columns=["TICKER", "TS", "CLOSE", "PREDICTED_RETURN"])
+    # Debug data info
+    with st.sidebar:
+        st.text(f"Predictions: {int(merged['PREDICTED_RETURN'].notna().sum())} rows")
+        st.text(f"Features: {len(merged)} rows")
 
-        with tab_overview:
-            c1, c2, c3, c4 = st.columns(4)
-            num_rows = len(merged) if not merged.empty else 0
-            
-            # Safe metric calculations with null checking
-            if not merged.empty and "PREDICTED_RETURN" in merged.columns:
-                pred_col = merged["PREDICTED_RETURN"].dropna()
-                avg_pred = float(pred_col.mean()) if not pred_col.empty else 0.0
-                std_pred = float(pred_col.std()) if not pred_col.empty else 0.0
+    if view == "Overview":
+        if stats is None:
+            render_overview_metrics(metric_cols, *frame_overview_stats(merged))
+        st.divider()
+        
+        st.subheader(f"{ticker} — Predictions (selected window)")
+        # Every loader (and the load-error fallback) yields TICKER, TS, CLOSE and PREDICTED_RETURN,
+        # so emptiness is the only thing to check before charting
+        if not merged.empty:
+            # Filter out null predictions for charting
+            chart_data = _downsample(merged.dropna(subset=["PREDICTED_RETURN"]))
+            if not chart_data.empty:
+                try:
+                    st.line_chart(
+                        chart_data, x="TS", y="PREDICTED_RETURN", x_label="Time", y_label="Predicted return", height=400
+                    )
+                except Exception as e:
+                    st.error(f"Chart error: {e}")
             else:
-                avg_pred = std_pred = 0.0
-                
-            c1.metric("Rows", f"{num_rows:,}")
-            c2.metric("Avg predicted", f"{avg_pred:.5f}")
-            c3.metric("Std predicted", f"{std_pred:.5f}")
-            c4.metric("Model version", selected_version)
-            st.divider()
-            
-            st.subheader(f"{ticker} — Predictions (selected window)")
-            if not merged.empty and "PREDICTED_RETURN" in merged.columns:
-                # Filter out null predictions for charting
-                chart_data = merged.dropna(subset=["PREDICTED_RETURN"])
-                if not chart_data.empty:
-                    try:
-                        import altair as alt
-                        # Ensure TS is datetime
-                        chart_data = chart_data.copy()
-                        chart_data['TS'] = pd.to_datetime(chart_data['TS'])
-                        
-                        ch = (
-                            alt.Chart(chart_data)
-                            .mark_line(point=True)
-                            .encode(
-                                x=alt.X("TS:T", title="Time", axis=alt.Axis(format="%Y-%m-%d %H:%M")),
-                                y=alt.Y("PREDICTED_RETURN:Q", title="Predicted return", scale=alt.Scale(zero=False))
-                            )
-                            .properties(height=400)
-                        )
-                        st.altair_chart(ch, use_container_width=True)
-                    except Exception as e:
-                        st.error(f"Chart error: {e}")
-                        # Fallback to simple line chart
-                        if "TS" in chart_data.columns and "PREDICTED_RETURN" in chart_data.columns:
-                            chart_data_clean = chart_data[["TS", "PREDICTED_RETURN"]].dropna()
-                            if not chart_data_clean.empty:
-                                st.line_chart(chart_data_clean.set_index("TS"))
-                else:
-                    st.info("No valid prediction data to chart.")
+                st.info("No valid prediction data to chart.")
+        else:
+            st.info("No predictions available for the selection.")
+    else:
+        st.subheader("Detail table")
+        if not merged.empty:
+            # Loaders already return rows ordered by TS. Only the first rows go to the browser unless
+            # asked; a collapsed st.expander would still ship the full table, hence the toggle
+            if len(merged) > MAX_TABLE_ROWS and not st.toggle(f"Show all {len(merged):,} rows"):
+                st.caption(f"Showing the first {MAX_TABLE_ROWS:,} rows.")
+                st.dataframe(merged.head(MAX_TABLE_ROWS), hide_index=True, use_container_width=True)
             else:
-                st.info("No predictions available for the selection.")
-
-        with tab_signals:
-            st.subheader("🤖 AI Trading Signals")
-            st.markdown("**Experience the same ML trading signals that power Snowflake Intelligence!**")
-            
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                # Signal analysis section
-                signal_ticker = st.selectbox("Select ticker for signal analysis", options=tickers[:20] if tickers else [], key="signal_ticker")
-                signal_days = st.slider("Analysis period (days)", min_value=1, max_value=90, value=7, key="signal_days")
-                
-                if st.button("Get AI Trading Signal", type="primary"):
-                    if signal_ticker:
-                        with st.spinner("🤖 Analyzing with AI..."):
-                            signal_result = get_trading_signal_demo(session, signal_ticker, signal_days)
-                        
-                        st.markdown("### 📊 AI Analysis Result:")
-                        st.text_area("Trading Signal", value=signal_result, height=400, key="signal_output")
-                    else:
-                        st.warning("Please select a ticker")
+                st.dataframe(merged, hide_index=True, use_container_width=True)
             
-            with col2:
-                st.markdown("### 🎯 Demo Questions")
-                st.markdown("Try these in **Snowflake Intelligence**:")
-                
-                demo_questions = [
-                    f"What is the trading signal for {signal_ticker or 'AAPL'} based on the last 7 days?",
-                    f"Give me a trading recommendation for {signal_ticker or 'MSFT'} using 14 days of data",
-                    f"Based on our ML model, should I buy or sell {signal_ticker or 'GOOGL'}?",
-                    "Compare trading signals for AAPL, MSFT, and GOOGL using the last 30 days"
-                ]
-                
-                for i, question in enumerate(demo_questions, 1):
-                    st.markdown(f"**{i}.** *{question}*")
-                
-                st.markdown("---")
-                st.markdown("### 🔗 Intelligence Integration")
-                st.markdown("""
-                **Function:** `GET_TRADING_SIGNAL`  
-                **Parameters:**
-                - `ticker_symbol` (string)
-                - `days_back` (integer, default: 7)
-                
-                **Try it in Intelligence!** 🚀
-                """)
-            
-            # Quick comparison section
-            st.markdown("---")
-            st.subheader("📈 Quick Signal Comparison")
-            
-            if st.button("Compare Top 5 Stocks", help="Get trading signals for AAPL, MSFT, GOOGL, AMZN, TSLA"):
-                comparison_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
-                comparison_results = []
-                
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                for i, comp_ticker in enumerate(comparison_tickers):
-                    status_text.text(f"Analyzing {comp_ticker}...")
-                    try:
-                        signal = get_trading_signal_demo(session, comp_ticker, 7)
-                        # Extract just the signal part for comparison
-                        signal_lines = [line for line in signal.split('\n') if 'SIGNAL:' in line]
-                        if signal_lines:
-                            signal_text = signal_lines[0].split('SIGNAL:')[1].strip()
-                            # Clean up emoji and formatting
-                            signal_text = signal_text.replace('**', '').strip()
-                        else:
-                            signal_text = "Unknown"
-                        comparison_results.append({'Ticker': comp_ticker, 'Signal': signal_text})
-                    except Exception as e:
-                        comparison_results.append({'Ticker': comp_ticker, 'Signal': f"Error: {str(e)[:50]}..."})
-                    
-                    progress_bar.progress((i + 1) / len(comparison_tickers))
-                
-                status_text.empty()
-                progress_bar.empty()
-                
-                if comparison_results:
-                    comparison_df = pd.DataFrame(comparison_results)
-                    st.dataframe(comparison_df, use_container_width=True)
-                else:
-                    st.warning("No comparison results available")
-
-        with tab_preds:
-            st.subheader("Detail table")
-            if not merged.empty:
-                # Sort by TS and show data table
-                display_df = merged.sort_values("TS").reset_index(drop=True)
-                st.dataframe(display_df, use_container_width=True)
-                
-                st.subheader("Close price context")
-                if not feats_pd.empty and "CLOSE" in feats_pd.columns:
-                    # Clean the data for charting
-                    price_data = feats_pd.dropna(subset=["CLOSE"])
-                    if not price_data.empty:
-                        try:
-                            import altair as alt
-                            # Ensure TS is datetime
-                            price_data = price_data.copy()
-                            price_data['TS'] = pd.to_datetime(price_data['TS'])
-                            
-                            ch2 = (
-                                alt.Chart(price_data)
-                                .mark_line(color="#1f77b4", point=True)
-                                .encode(
-                                    x=alt.X("TS:T", title="Time", axis=alt.Axis(format="%Y-%m-%d %H:%M")),
-                                    y=alt.Y("CLOSE:Q", title="Close price", scale=alt.Scale(zero=False))
-                                )
-                                .properties(height=400)
-                            )
-                            st.altair_chart(ch2, use_container_width=True)
-                        except Exception as e:
-                            st.error(f"Chart error: {e}")
-                            # Fallback to simple line chart
-                            try:
-                                price_clean = price_data[["TS", "CLOSE"]].dropna()
-                                if not price_clean.empty:
-                                    price_clean['TS'] = pd.to_datetime(price_clean['TS'])
-                                    st.line_chart(price_clean.set_index("TS"))
-                            except Exception:
-                                st.warning("Could not display price chart")
-                    else:
-                        st.info("No valid price data to display.")
-                else:
-                    st.info("No price data available for current filters.")
+            st.subheader("Close price context")
+            # Clean the data for charting
+            price_data = _downsample(merged.dropna(subset=["CLOSE"]))
+            if not price_data.empty:
+                try:
+                    st.line_chart(price_data, x="TS", y="CLOSE", x_label="Time", y_label="Close price", height=400)
+                except Exception:
+                    st.warning("Could not display price chart")
             else:
-                st.info("No data to display for current filters.")
-
-        with tab_drift:
-            st.subheader("Recent feature drift (PSI)")
-            try:
-                psi_pd = session.table("SP500_STOCK_DEMO.DATA.DRIFT_PSI_SP500").to_pandas()
-                if not psi_pd.empty:
-                    st.dataframe(psi_pd.sort_values("FEATURE").reset_index(drop=True))
-                else:
-                    st.info("PSI table is empty.")
-            except Exception:
-                st.info("PSI table not found. Run the inference/monitoring notebook to generate it.")
-
-        with tab_explain:
-            st.subheader("Global feature importance (mean |SHAP|)")
-            try:
-                shap_pd = session.table("SP500_STOCK_DEMO.DATA.FEATURE_SHAP_GLOBAL_TOP").to_pandas()
-                if not shap_pd.empty:
-                    topn = shap_pd.sort_values("mean_abs_shap", ascending=False).head(15)
-                    st.bar_chart(topn.set_index("feature")["mean_abs_shap"])
-                    st.dataframe(topn.reset_index(drop=True))
-                else:
-                    st.info("No SHAP importance table found.")
-            except Exception:
-                st.info("No SHAP importance table found.")
+                st.info("No valid price data to display.")
+        else:
+            st.info("No data to display for current filters.")
 
 
 if __name__ == "__main__":